@@ -10,12 +10,17 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
-# LOAD CUSTOM THEME CSS
+# LOAD CUSTOM THEME CSS (read once per server process)
 # -------------------------------------------------
-theme_path = Path("assets/theme.css")
-if theme_path.exists():
-    with open(theme_path, "r") as css_file:
-        st.markdown(f"<style>{css_file.read()}</style>", unsafe_allow_html=True)
+@st.cache_resource
+def load_theme():
+    theme_path = Path("assets/theme.css")
+    return theme_path.read_text() if theme_path.exists() else ""
+
+
+theme_css = load_theme()
+if theme_css:
+    st.markdown(f"<style>{theme_css}</style>", unsafe_allow_html=True)
 
 # -------------------------------------------------
 # MAIN TITLE
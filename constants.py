@@ -0,0 +1,58 @@
+from types import MappingProxyType
+
+# -------------------------------------------------
+# SHARED PRESETS
+# One read-only copy for every page, so the R₀ values
+# cannot drift between pages or be mutated at runtime.
+# -------------------------------------------------
+
+# Vaccine-preventable diseases (R₀ values)
+DISEASE_R0 = MappingProxyType({
+    "Measles (MMR)": 15,
+    "Pertussis (DTaP)": 12,
+    "Polio (IPV)": 6,
+    "Varicella (Chickenpox)": 10,
+    "Hepatitis B (HepB)": 3,
+    "HPV": 3,
+    "Hib": 1.3,
+    "Pneumococcal (PCV)": 2,
+})
+
+# COVID-19 variants (R₀ values)
+COVID_VARIANT_R0 = MappingProxyType({
+    "COVID-19 (Original Wuhan 2020)": 2.5,
+    "COVID-19 (Alpha Variant)": 4,
+    "COVID-19 (Delta Variant)": 6.5,
+    "COVID-19 (Omicron BA.1)": 9,
+    "COVID-19 (Omicron BA.5)": 12,
+    "COVID-19 (Omicron XBB/BQ)": 13,
+})
+
+ALL_DISEASE_R0 = MappingProxyType({**DISEASE_R0, **COVID_VARIANT_R0})
+
+# Spread Visualization's own COVID-19 presets (its labels and R₀ values
+# differ from the Vaccine Impact list above)
+SPREAD_DISEASE_R0 = MappingProxyType({
+    **DISEASE_R0,
+    "COVID-19 (Ancestral Wuhan)": 3,
+    "COVID-19 Delta Variant": 6,
+    "COVID-19 Omicron BA.1": 9,
+    "COVID-19 Omicron BA.5": 12,
+})
+
+# Real-world vaccination coverage presets (%)
+VACC_PRESETS = MappingProxyType({
+    "MMR": 94,
+    "DTaP": 90,
+    "Polio": 85,
+    "Varicella": 90,
+    "Hib": 90,
+    "HepB": 91,
+    "PCV": 92,
+})
+
+# Widget option lists, built once at import
+DISEASE_NAMES = tuple(DISEASE_R0)
+ALL_DISEASE_NAMES = tuple(ALL_DISEASE_R0)
+SPREAD_DISEASE_NAMES = tuple(SPREAD_DISEASE_R0)
+PRESET_NAMES = tuple(VACC_PRESETS) + ("None",)
@@ -1,18 +1,6 @@
 import streamlit as st
 
-# -------------------------------------------------
-# DISEASE PRESETS (R₀ VALUES)
-# -------------------------------------------------
-disease_r0 = {
-    "Measles (MMR)": 15,
-    "Pertussis (DTaP)": 12,
-    "Polio (IPV)": 6,
-    "Varicella (Chickenpox)": 10,
-    "Hepatitis B (HepB)": 3,
-    "HPV": 3,
-    "Hib": 1.3,
-    "Pneumococcal (PCV)": 2
-}
+from constants import DISEASE_R0 as disease_r0, DISEASE_NAMES
 
 # -------------------------------------------------
 # PAGE TITLE
@@ -28,7 +16,7 @@ Use this tool to explore how vaccination impacts community-level protection.
 # -------------------------------------------------
 disease = st.selectbox(
     "Choose a disease:",
-    list(disease_r0.keys())
+    DISEASE_NAMES
 )
 
 R0_default = disease_r0[disease]
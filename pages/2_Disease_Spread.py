@@ -1,21 +1,9 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import altair as alt
 
-# -------------------------------------------------
-# DISEASE PRESET R₀ VALUES
-# -------------------------------------------------
-disease_r0 = {
-    "Measles (MMR)": 15,
-    "Pertussis (DTaP)": 12,
-    "Polio (IPV)": 6,
-    "Varicella (Chickenpox)": 10,
-    "Hepatitis B (HepB)": 3,
-    "HPV": 3,
-    "Hib": 1.3,
-    "Pneumococcal (PCV)": 2
-}
+from constants import DISEASE_R0 as disease_r0, DISEASE_NAMES
+from simulation import growth_curve
 
 # -------------------------------------------------
 # PAGE TITLE
@@ -31,7 +19,7 @@ This page shows **basic exponential transmission** assuming no immunity in the p
 # -------------------------------------------------
 disease = st.selectbox(
     "Choose a disease:",
-    list(disease_r0.keys())
+    DISEASE_NAMES
 )
 
 R0_default = disease_r0[disease]
@@ -57,35 +45,35 @@ generations = st.slider(
 # -------------------------------------------------
 # CALCULATE INFECTIONS
 # -------------------------------------------------
-infected = [1]  # generation 0 starts with a single infected person
-
-for g in range(1, generations + 1):
-    infected.append(infected[-1] * R0)
+# generation 0 starts with a single infected person, so generation g has R0**g
+gens, infected = growth_curve(R0, generations)
 
+# float32 for the chart payload; the summary metric uses the float64 value
 df = pd.DataFrame({
-    "Generation": list(range(generations + 1)),
-    "Infected": infected
+    "Generation": gens.astype(np.int8),  # slider caps generations at 12
+    "Infected": infected.astype(np.float32)
 })
 
 # -------------------------------------------------
 # CHART — COLOR GRADIENT (GREEN → YELLOW → RED)
 # -------------------------------------------------
-chart = (
-    alt.Chart(df)
-    .mark_bar()
-    .encode(
-        x=alt.X("Generation:O"),
-        y=alt.Y("Infected:Q"),
-        color=alt.Color(
-            "Infected:Q",
-            scale=alt.Scale(scheme="redyellowgreen"),
-            legend=None
-        )
-    )
-    .properties(height=400)
-)
+# Plain Vega-Lite spec — skips Altair's per-rerun schema validation
+chart_spec = {
+    "mark": "bar",
+    "encoding": {
+        "x": {"field": "Generation", "type": "ordinal"},
+        "y": {"field": "Infected", "type": "quantitative"},
+        "color": {
+            "field": "Infected",
+            "type": "quantitative",
+            "scale": {"scheme": "redyellowgreen"},
+            "legend": None
+        }
+    },
+    "height": 400
+}
 
-st.altair_chart(chart, use_container_width=True)
+st.vega_lite_chart(df, chart_spec, use_container_width=True)
 
 # -------------------------------------------------
 # SUMMARY STAT
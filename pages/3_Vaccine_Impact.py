@@ -1,49 +1,148 @@
 ################################################################################
-# 3_Vaccine_Impact.py — COMPLETE, FIXED, FULLY SYNCHRONIZED VERSION
+# 3_Vaccine_Impact.py
 ################################################################################
 
 import streamlit as st
 import pandas as pd
 import numpy as np
-import altair as alt
-import networkx as nx
 import plotly.graph_objects as go
-import math
+
+from constants import (
+    ALL_DISEASE_R0 as disease_r0,
+    ALL_DISEASE_NAMES as DISEASE_NAMES,
+    VACC_PRESETS as vacc_presets,
+    PRESET_NAMES,
+)
+from simulation import growth_curve, run_seir, tree_edges
 
 # =============================================================================
-# BASELINE R₀ VALUES FOR DISEASES
+# SEIR MODEL (FORWARD EULER, 1-DAY STEPS)
 # =============================================================================
-disease_r0 = {
-    # Vaccine-preventable diseases
-    "Measles (MMR)": 15,
-    "Pertussis (DTaP)": 12,
-    "Polio (IPV)": 6,
-    "Varicella (Chickenpox)": 10,
-    "Hepatitis B (HepB)": 3,
-    "HPV": 3,
-    "Hib": 1.3,
-    "Pneumococcal (PCV)": 2,
-
-    # COVID-19 Variants
-    "COVID-19 (Original Wuhan 2020)": 2.5,
-    "COVID-19 (Alpha Variant)": 4,
-    "COVID-19 (Delta Variant)": 6.5,
-    "COVID-19 (Omicron BA.1)": 9,
-    "COVID-19 (Omicron BA.5)": 12,
-    "COVID-19 (Omicron XBB/BQ)": 13,
-}
+# Cached on the slider inputs so reruns from other tabs skip the integration
+@st.cache_data(show_spinner=False)
+def compute_seir(days, incubation, infectious_period, Re):
+    N = 1_000_000
+    I0, E0 = 10, 5
+    S0 = N - I0 - E0
+
+    beta = Re / infectious_period
+    sigma = 1 / incubation
+    gamma = 1 / infectious_period
+
+    Y = run_seir(days, beta, sigma, gamma, N, S0, E0, I0)
+
+    # Long form built straight from the arrays (one block per state, in the
+    # same order DataFrame.melt produced) — no wide frame, no reshape
+    states = np.array(["Susceptible", "Exposed", "Infectious", "Recovered"])
+    return pd.DataFrame({
+        "Day": np.tile(np.arange(days + 1, dtype=np.int16), len(states)),
+        "State": np.repeat(states, days + 1),
+        # float32 halves the chart payload; integration itself stays float64
+        "Population": Y.ravel().astype(np.float32)
+    })
+
 # =============================================================================
-# REAL-WORLD VACCINATION PRESETS
+# TRANSMISSION TREE
 # =============================================================================
-vacc_presets = {
-    "MMR": 94,
-    "DTaP": 90,
-    "Polio": 85,
-    "Varicella": 90,
-    "Hib": 90,
-    "HepB": 91,
-    "PCV": 92,
-}
+def generate_tree(newR, max_gen=5, max_nodes=1000):
+    # Every case infects the same number of people, so each generation is the
+    # previous one with every node repeated newR times. Nodes are numbered in
+    # breadth-first order; parent[i] / generation[i] describe node i.
+    parent = np.full(max_nodes + 1, -1, dtype=np.int32)
+    generation = np.zeros(max_nodes + 1, dtype=np.int8)  # also the marker colour
+
+    start, end = 0, 1  # node ids of the current generation: [start, end)
+    for g in range(1, max_gen + 1):
+        count = min((end - start) * newR, max_nodes + 1 - end)
+        if count <= 0:
+            break
+        # Child k of this generation belongs to parent start + k // newR, so
+        # only the children kept under the cap are ever materialised
+        parent[end:end + count] = start + np.arange(count) // newR
+        generation[end:end + count] = g
+        start, end = end, end + count
+
+    return parent[:end], generation[:end]
+
+
+# Closed-form radial layout: generation g sits on a ring of radius g,
+# its nodes evenly spaced by angle (no iterative force-directed solve)
+def radial_layout(generation):
+    # Nodes are numbered breadth-first, so each generation is a contiguous
+    # run of ids and a node's rank on its ring is its id minus the run start
+    counts = np.bincount(generation)
+    first = np.cumsum(counts) - counts
+    rank = np.arange(len(generation)) - first[generation]
+
+    angles = 2 * np.pi * rank / counts[generation]
+    node_x = generation * np.cos(angles)
+    node_y = generation * np.sin(angles)
+    return node_x, node_y
+
+
+# Returns plot-ready (edge_x, edge_y, node_x, node_y, node_gen) arrays.
+# Keyed on the integer branching factor, not Rₑ itself, so every coverage
+# setting with the same int(Rₑ) shares one cache entry.
+@st.cache_data(max_entries=32, show_spinner=False)
+def tree_coordinates(newR, max_gen=5, max_nodes=1000):
+    parent, node_gen = generate_tree(newR, max_gen, max_nodes)
+    node_x, node_y = radial_layout(node_gen)
+
+    edge_x, edge_y = tree_edges(parent, node_x, node_y)
+
+    node_x = node_x.astype(np.float32)
+    node_y = node_y.astype(np.float32)
+    return edge_x, edge_y, node_x, node_y, node_gen
+
+
+# One figure per (tree, hover setting), shared read-only across reruns and
+# sessions (st.plotly_chart only serialises it), so Plotly's trace
+# validation runs once per figure rather than on every rerun
+@st.cache_resource(max_entries=32, show_spinner=False)
+def tree_figure(newR, show_hover):
+    edge_x, edge_y, node_x, node_y, node_gen = tree_coordinates(newR)
+
+    # Hover labels are formatted in the browser from the point index and the
+    # (binary) generation array — no per-node Python strings to build
+    if show_hover:
+        hover = dict(
+            customdata=node_gen,
+            hovertemplate="Node %{pointNumber} (Gen %{customdata})<extra></extra>"
+        )
+    else:
+        hover = dict(hoverinfo="skip")
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Scattergl(
+        x=edge_x, y=edge_y,
+        mode="lines",
+        line=dict(color="gray", width=1),
+        hoverinfo="none"
+    ))
+
+    fig.add_trace(go.Scattergl(
+        x=node_x, y=node_y,
+        mode="markers",
+        marker=dict(
+            size=10,
+            color=node_gen,
+            colorscale="Viridis",
+            showscale=True,
+            colorbar=dict(title="Generation")
+        ),
+        **hover
+    ))
+
+    fig.update_layout(
+        showlegend=False,
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        height=600,
+        plot_bgcolor="white",
+        margin=dict(t=30, b=20, l=20, r=20)
+    )
+    return fig
 
 # =============================================================================
 # PAGE HEADER
@@ -74,7 +173,7 @@ with tab1:
 
     st.subheader("Basic Vaccination Impact")
 
-    disease = st.selectbox("Choose a disease:", list(disease_r0.keys()))
+    disease = st.selectbox("Choose a disease:", DISEASE_NAMES)
     R0 = disease_r0[disease]
     st.write(f"**Baseline R₀ for {disease}: {R0}**")
 
@@ -97,7 +196,7 @@ with tab1:
     with colB:
         preset = st.radio(
             "Choose preset:",
-            list(vacc_presets.keys()) + ["None"],
+            PRESET_NAMES,
             horizontal=True,
             key="preset_choice"
         )
@@ -120,76 +219,75 @@ with tab1:
 
     coverage = st.session_state.coverage_value
 
-    # Herd immunity threshold
+    # Herd immunity threshold and effective R
     herd_threshold = (1 - 1 / R0) * 100
-    st.metric("Herd Immunity Threshold", f"{herd_threshold:.1f}%")
+    Re = R0 * (1 - coverage / 100)
 
-    if coverage >= herd_threshold:
-        st.success("Population exceeds herd immunity threshold.")
-    else:
-        st.warning("Population is below herd immunity threshold.")
+    # Render the results as one block once everything is computed
+    with st.container():
+        st.metric("Herd Immunity Threshold", f"{herd_threshold:.1f}%")
 
-    # Effective R
-    Re = R0 * (1 - coverage / 100)
-    st.metric("Effective Rₑ", f"{Re:.2f}")
+        if coverage >= herd_threshold:
+            st.success("Population exceeds herd immunity threshold.")
+        else:
+            st.warning("Population is below herd immunity threshold.")
+
+        st.metric("Effective Rₑ", f"{Re:.2f}")
 
     # Growth modeling
     generations = st.slider("Number of generations", 1, 12, 6)
 
-    infected_no = [1]
-    infected_yes = [1]
+    # Both curves in one broadcast power: row 0 = R₀**g, row 1 = Rₑ**g
+    gens, curves = growth_curve([[R0], [Re]], generations)
+    infected_no, infected_yes = curves
+    cumulative_no, cumulative_yes = curves.sum(axis=1)
 
-    for g in range(1, generations + 1):
-        infected_no.append(infected_no[-1] * R0)
-        infected_yes.append(infected_yes[-1] * Re)
-
-    df_no = pd.DataFrame({"Generation": range(generations + 1), "Infected": infected_no})
-    df_yes = pd.DataFrame({"Generation": range(generations + 1), "Infected": infected_yes})
+    # Charts get float32 copies; the summary below uses the float64 values
+    # (generations are capped at 12 by the slider, so int8 holds them)
+    gen_col = gens.astype(np.int8)
+    df_no = pd.DataFrame({"Generation": gen_col, "Infected": infected_no.astype(np.float32)})
+    df_yes = pd.DataFrame({"Generation": gen_col, "Infected": infected_yes.astype(np.float32)})
 
     # Scale toggle
     scale = st.radio("Chart Scale", ["Linear", "Log Scale"], horizontal=True)
 
-    y_axis = alt.Y(
-        "Infected:Q",
-        scale=alt.Scale(type="log") if scale == "Log Scale" else alt.Scale(type="linear")
-    )
-
-    # Charts
-    chart_no = (
-        alt.Chart(df_no)
-        .mark_line(point=True, color="#E53935")
-        .encode(x="Generation:O", y=y_axis)
-        .properties(title="No Vaccination (R₀)")
-    )
-
-    chart_yes = (
-        alt.Chart(df_yes)
-        .mark_line(point=True, color="#43A047")
-        .encode(x="Generation:O", y=y_axis)
-        .properties(title=f"With Vaccination (Rₑ={Re:.2f})")
-    )
+    y_axis = {
+        "field": "Infected",
+        "type": "quantitative",
+        "scale": {"type": "log" if scale == "Log Scale" else "linear"}
+    }
+
+    # Charts (plain Vega-Lite specs — no Altair object building per rerun)
+    chart_no = {
+        "mark": {"type": "line", "point": True, "color": "#E53935"},
+        "encoding": {"x": {"field": "Generation", "type": "ordinal"}, "y": y_axis},
+        "title": "No Vaccination (R₀)"
+    }
+
+    chart_yes = {
+        "mark": {"type": "line", "point": True, "color": "#43A047"},
+        "encoding": {"x": {"field": "Generation", "type": "ordinal"}, "y": y_axis},
+        "title": f"With Vaccination (Rₑ={Re:.2f})"
+    }
 
     c1, c2 = st.columns(2)
-    c1.altair_chart(chart_no, use_container_width=True)
-    c2.altair_chart(chart_yes, use_container_width=True)
+    c1.vega_lite_chart(df_no, chart_no, use_container_width=True)
+    c2.vega_lite_chart(df_yes, chart_yes, use_container_width=True)
 
-    # Summary
-    st.markdown("### Summary")
-    st.write(f"""
+    # Summary (a single markdown element); counts shown as whole people
+    st.markdown(f"""
+    ### Summary
     **Final generation infections**
-    - No vaccination: {infected_no[-1]:,}
-    - With vaccination: {infected_yes[-1]:,}
+    - No vaccination: {infected_no[-1]:,.0f}
+    - With vaccination: {infected_yes[-1]:,.0f}
 
     **Cumulative infections**
-    - No vaccination: {sum(infected_no):,}
-    - With vaccination: {sum(infected_yes):,}
+    - No vaccination: {cumulative_no:,.0f}
+    - With vaccination: {cumulative_yes:,.0f}
     """)
 
 ################################################################################
-# TAB 2 — FIXED SEIR VS EXPONENTIAL GROWTH
-################################################################################
-################################################################################
-# TAB 2 — SEIR VS EXPONENTIAL GROWTH (FINAL FIX — NO transform_fold)
+# TAB 2 — SEIR VS EXPONENTIAL GROWTH
 ################################################################################
 with tab2:
 
@@ -203,153 +301,60 @@ with tab2:
     - **R** = Recovered  
     """)
 
-    # User inputs
-    days = st.slider("Simulation days", 30, 200, 120)
-    incubation = st.slider("Incubation period (days)", 1, 14, 4)
-    infectious_period = st.slider("Infectious period (days)", 1, 20, 6)
-
-    # SEIR parameters
-    N = 1_000_000
-    I0, E0 = 10, 5
-    S0 = N - I0 - E0
-
-    beta = Re / infectious_period
-    sigma = 1 / incubation
-    gamma = 1 / infectious_period
-
-    S, E, I, R = [S0], [E0], [I0], [0]
-
-    for t in range(days):
-        new_E = beta * S[-1] * I[-1] / N
-        new_I = sigma * E[-1]
-        new_R = gamma * I[-1]
-
-        S.append(S[-1] - new_E)
-        E.append(E[-1] + new_E - new_I)
-        I.append(I[-1] + new_I - new_R)
-        R.append(R[-1] + new_R)
-
-    # Build DataFrame
-    df = pd.DataFrame({
-        "Day": range(days + 1),
-        "Susceptible": S,
-        "Exposed": E,
-        "Infectious": I,
-        "Recovered": R
-    })
-
-    # 🔥 FIX: Melt BEFORE passing to Altair — safest for v6
-    df_long = df.melt(
-        id_vars="Day",
-        value_vars=["Susceptible", "Exposed", "Infectious", "Recovered"],
-        var_name="State",
-        value_name="Population"
-    )
-
-    # Clean, safe Altair chart (no fold, no reserved names)
-    chart = (
-        alt.Chart(df_long)
-        .mark_line()
-        .encode(
-            x=alt.X("Day:Q", title="Day"),
-            y=alt.Y("Population:Q", title="Population"),
-            color=alt.Color(
-                "State:N",
-                title="SEIR State",
-                scale=alt.Scale(range=[
-                    "#2E86C1",  # S
-                    "#F1C40F",  # E
-                    "#E74C3C",  # I
-                    "#27AE60",  # R
-                ])
-            ),
-            tooltip=["Day:Q", "State:N", "Population:Q"]
-        )
-        .properties(
-            height=500,
-            title="SEIR Epidemic Curve (Validated for Altair v6)"
-        )
-    )
-
-    st.altair_chart(chart, use_container_width=True)
+    # User inputs — batched in a form so adjusting several sliders
+    # triggers one rerun on submit instead of one per slider
+    with st.form("seir_form"):
+        days = st.slider("Simulation days", 30, 200, 120)
+        incubation = st.slider("Incubation period (days)", 1, 14, 4)
+        infectious_period = st.slider("Infectious period (days)", 1, 20, 6)
+        st.form_submit_button("Update SEIR curve")
+
+    df_long = compute_seir(days, incubation, infectious_period, Re)
+
+    # Plain Vega-Lite spec (no fold, no reserved names)
+    chart_spec = {
+        "mark": "line",
+        "encoding": {
+            "x": {"field": "Day", "type": "quantitative", "title": "Day"},
+            "y": {"field": "Population", "type": "quantitative", "title": "Population"},
+            "color": {
+                "field": "State",
+                "type": "nominal",
+                "title": "SEIR State",
+                "scale": {"range": [
+                    "#2E86C1",
+                    "#F1C40F",
+                    "#E74C3C",
+                    "#27AE60",
+                ]}
+            },
+            "tooltip": [
+                {"field": "Day", "type": "quantitative"},
+                {"field": "State", "type": "nominal"},
+                {"field": "Population", "type": "quantitative"}
+            ]
+        },
+        "height": 500,
+        "title": "SEIR Epidemic Curve"
+    }
+
+    st.vega_lite_chart(df_long, chart_spec, use_container_width=True)
 ################################################################################
 # TAB 3 — TRANSMISSION TREE
 ################################################################################
-with tab3:
+# Fragment: interactions inside this tab rerun only this function, not the
+# SEIR integration and charts of the other tabs
+@st.fragment
+def render_tree_tab(Re):
 
     st.subheader("Transmission Tree Visualization")
 
-    def generate_tree(Re, max_gen=5, max_nodes=1000):
-        G = nx.DiGraph()
-        G.add_node(0, generation=0)
-        node_id = 1
-        current = [0]
-
-        for g in range(1, max_gen + 1):
-            next_gen = []
-            for parent in current:
-                newR = max(1, int(Re))
-                for _ in range(newR):
-                    if node_id > max_nodes:
-                        return G
-                    G.add_node(node_id, generation=g)
-                    G.add_edge(parent, node_id)
-                    next_gen.append(node_id)
-                    node_id += 1
-            current = next_gen
-        return G
-
-    G = generate_tree(Re)
-    pos = nx.circular_layout(G)
-
-    # Edges
-    edge_x, edge_y = [], []
-    for u, v in G.edges():
-        x0, y0 = pos[u]
-        x1, y1 = pos[v]
-        edge_x.extend([x0, x1, None])
-        edge_y.extend([y0, y1, None])
-
-    # Nodes
-    node_x = [pos[n][0] for n in G.nodes()]
-    node_y = [pos[n][1] for n in G.nodes()]
-    node_gen = [G.nodes[n]["generation"] for n in G.nodes()]
+    show_hover = st.checkbox("Show node details on hover", value=True)
 
-    fig = go.Figure()
-
-    fig.add_trace(go.Scatter(
-        x=edge_x, y=edge_y,
-        mode="lines",
-        line=dict(color="gray", width=1),
-        hoverinfo="none"
-    ))
-
-    fig.add_trace(go.Scatter(
-        x=node_x, y=node_y,
-        mode="markers",
-        marker=dict(
-            size=10,
-            color=node_gen,
-            colorscale="Viridis",
-            showscale=True,
-            colorbar=dict(title="Generation")
-        ),
-        hoverinfo="text",
-        text=[f"Node {n} (Gen {G.nodes[n]['generation']})" for n in G.nodes()]
-    ))
-
-    fig.update_layout(
-        showlegend=False,
-        xaxis=dict(visible=False),
-        yaxis=dict(visible=False),
-        height=600,
-        plot_bgcolor="white",
-        margin=dict(t=30, b=20, l=20, r=20)
-    )
+    fig = tree_figure(max(1, int(Re)), show_hover)
 
     st.plotly_chart(fig, use_container_width=True)
 
 
-
-
-
+with tab3:
+    render_tree_tab(Re)
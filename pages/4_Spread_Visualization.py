@@ -1,30 +1,153 @@
 import streamlit as st
 import numpy as np
 import pandas as pd
-import altair as alt
 import plotly.graph_objects as go
-import networkx as nx
-import time
 import math
-import json
+
+from constants import SPREAD_DISEASE_R0 as disease_r0, SPREAD_DISEASE_NAMES as DISEASE_NAMES
+from simulation import growth_curve, run_seir, tree_edges
 
 # ============================================================
-# DISEASE PRESET R0 VALUES
+# CACHED SIMULATION HELPERS
+# Pure functions of their arguments, so Streamlit can reuse results
+# across reruns triggered by unrelated widgets
 # ============================================================
-disease_r0 = {
-    "Measles (MMR)": 15,
-    "Pertussis (DTaP)": 12,
-    "Polio (IPV)": 6,
-    "Varicella (Chickenpox)": 10,
-    "Hepatitis B (HepB)": 3,
-    "HPV": 3,
-    "Hib": 1.3,
-    "Pneumococcal (PCV)": 2,
-    "COVID-19 (Ancestral Wuhan)": 3,
-    "COVID-19 Delta Variant": 6,
-    "COVID-19 Omicron BA.1": 9,
-    "COVID-19 Omicron BA.5": 12,
-}
+# Tree stored as parallel arrays indexed by node id (breadth-first order):
+# parent[i] (-1 for the index case), generation[i], vacc[i]
+def generate_tree(Re, max_gen, superspreader_pct, vacc_pct, seed, max_nodes=2000):
+
+    rng = np.random.default_rng(seed)
+    parent = np.full(max_nodes + 1, -1, dtype=np.int32)
+    generation = np.zeros(max_nodes + 1, dtype=np.int8)  # also the marker colour
+    vacc = np.zeros(max_nodes + 1, dtype=bool)
+
+    n = 1  # nodes created so far
+    current = np.array([0])
+
+    for gen in range(1, max_gen + 1):
+
+        # Every case so far was vaccinated: no one left to transmit
+        if current.size == 0:
+            break
+
+        # One batched draw per generation instead of one call per node
+        is_super = rng.random(len(current)) < superspreader_pct / 100
+        newR = np.maximum(1, (Re * np.where(is_super, 3, 1)).astype(int))
+
+        # Children in parent order, truncated at the node cap
+        children_of = np.repeat(current, newR)[:max_nodes + 1 - n]
+        count = children_of.size
+        end = n + count
+
+        # Draw only for children that are kept; the tree stops at the cap,
+        # so this leaves every kept node's draw unchanged
+        vaccinated = rng.random(count) < vacc_pct / 100
+
+        parent[n:end] = children_of
+        generation[n:end] = gen
+        vacc[n:end] = vaccinated
+
+        if count < newR.sum():
+            n = end
+            break
+
+        # Vaccinated children do not transmit further
+        current = np.arange(n, end)[~vaccinated]
+        n = end
+
+    return parent[:n], generation[:n], vacc[:n]
+
+
+# SIMPLE HIERARCHICAL LAYOUT (NO SCIPY REQUIRED)
+# Generation g is row -g; its nodes are spread evenly across [-1, 1]
+def hierarchical_layout(generation):
+    # Nodes are numbered breadth-first, so each generation is a contiguous
+    # run of ids and a node's rank in its row is its id minus the run start
+    counts = np.bincount(generation)
+    first = np.cumsum(counts) - counts
+    rank = np.arange(len(generation)) - first[generation]
+
+    # Same spacing as np.linspace(-1, 1, count) per row; a lone node sits at -1
+    span = np.maximum(counts[generation] - 1, 1)
+    node_x = -1 + 2 * rank / span
+    node_y = -generation.astype(float)
+    return node_x, node_y
+
+
+# Plot-ready (edge_x, edge_y, node_x, node_y, node_gen) arrays; bounded so
+# browsing many seeds does not grow the cache without limit
+@st.cache_data(max_entries=32, show_spinner=False)
+def tree_coordinates(Re, max_gen, superspreader_pct, vacc_pct, seed):
+    parent, node_gen, vacc = generate_tree(
+        Re, max_gen, superspreader_pct, vacc_pct, seed
+    )
+    node_x, node_y = hierarchical_layout(node_gen)
+
+    edge_x, edge_y = tree_edges(parent, node_x, node_y)
+
+    node_x = node_x.astype(np.float32)
+    node_y = node_y.astype(np.float32)
+    return edge_x, edge_y, node_x, node_y, node_gen
+
+
+# One figure per tree, shared read-only (st.plotly_chart only serialises it),
+# so reruns that keep the tree — e.g. timing sliders — skip trace validation
+@st.cache_resource(max_entries=8, show_spinner=False)
+def tree_figure(Re, max_gen, superspreader_pct, vacc_pct, seed):
+    edge_x, edge_y, node_x, node_y, node_gen = tree_coordinates(
+        Re, max_gen, superspreader_pct, vacc_pct, seed
+    )
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Scattergl(
+        x=edge_x, y=edge_y,
+        mode="lines",
+        line=dict(width=1, color="gray"),
+        hoverinfo="none"
+    ))
+
+    fig.add_trace(go.Scattergl(
+        x=node_x, y=node_y,
+        mode="markers",
+        marker=dict(
+            size=12,
+            color=node_gen,
+            colorscale="Viridis",
+            showscale=True,
+            colorbar=dict(title="Generation")
+        )
+    ))
+
+    fig.update_layout(
+        showlegend=False,
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        height=600
+    )
+    return fig
+
+
+@st.cache_data(show_spinner=False)
+def compute_seir(Re, incubation_days, infectious_days, days):
+
+    N = 1_000_000
+    I0, E0 = 10, 5
+    S0 = N - I0 - E0
+
+    beta = Re / infectious_days
+    sigma = 1 / incubation_days
+    gamma = 1 / infectious_days
+
+    Y = run_seir(days, beta, sigma, gamma, N, S0, E0, I0)
+
+    # Long form with the column names transform_fold used to produce, so the
+    # chart needs no client-side fold; float32 halves the chart payload
+    return pd.DataFrame({
+        "index": np.tile(np.arange(days + 1, dtype=np.int16), 4),
+        "key": np.repeat(["S", "E", "I", "R"], days + 1),
+        "value": Y.ravel().astype(np.float32)
+    })
 
 # ============================================================
 # PAGE HEADER
@@ -39,7 +162,7 @@ mode = st.selectbox(
 # ============================================================
 # DISEASE + R0
 # ============================================================
-disease = st.selectbox("Choose a disease:", list(disease_r0.keys()))
+disease = st.selectbox("Choose a disease:", DISEASE_NAMES)
 R0_default = disease_r0[disease]
 R0_base = st.slider("Baseline R₀", 1.0, 20.0, float(R0_default), 0.1)
 
@@ -78,7 +201,10 @@ with st.expander("Advanced Epidemiologic Timing"):
 # ============================================================
 # 1. ANIMATED SPREAD
 # ============================================================
-if mode == "Animated Spread":
+# Fragment: "Next Generation →" reruns only this block, not the disease,
+# Rₑ and timing widgets above it
+@st.fragment
+def render_animated_spread(Re, generation_interval):
 
     st.subheader("Generation-by-Generation Spread")
 
@@ -93,181 +219,106 @@ if mode == "Animated Spread":
     gen = st.session_state.anim_gen
     st.write(f"Showing Generation 0 → {gen}")
 
-    infected = [1]
-    for g in range(1, gen + 1):
-        infected.append(infected[-1] * Re)
+    # Chart-only values: float32 directly (Re**8 is far inside its range)
+    gens, infected = growth_curve(Re, gen, dtype=np.float32)
 
     df = pd.DataFrame({
-        "Generation": list(range(gen + 1)),
+        "Generation": gens.astype(np.int8),  # at most max_gen = 8
         "Infected": infected
     })
 
-    chart = (
-        alt.Chart(df)
-        .mark_bar()
-        .encode(
-            x="Generation:O",
-            y="Infected:Q",
-            color=alt.Color("Infected:Q", scale=alt.Scale(scheme="redyellowgreen"))
-        )
-        .properties(height=400)
-    )
-
-    st.altair_chart(chart, use_container_width=True)
+    # Plain Vega-Lite spec — skips Altair's per-rerun schema validation
+    chart_spec = {
+        "mark": "bar",
+        "encoding": {
+            "x": {"field": "Generation", "type": "ordinal"},
+            "y": {"field": "Infected", "type": "quantitative"},
+            "color": {
+                "field": "Infected",
+                "type": "quantitative",
+                "scale": {"scheme": "redyellowgreen"}
+            }
+        },
+        "height": 400
+    }
+
+    st.vega_lite_chart(df, chart_spec, use_container_width=True)
 
     timing_df = pd.DataFrame({
-        "Generation": list(range(gen + 1)),
-        "Approx Days": [round(g * generation_interval, 1) for g in range(gen + 1)]
+        "Generation": gens,
+        "Approx Days": np.round(gens * generation_interval, 1)
     })
 
     st.dataframe(timing_df, use_container_width=True)
 
+
 # ============================================================
 # 2. NODE TREE SPREAD
 # ============================================================
-elif mode == "Node Tree Spread":
+# Fragment: submitting the tree form reruns only this block
+@st.fragment
+def render_node_tree(Re, generation_interval):
 
     st.subheader("Transmission Tree")
 
-    superspreader_pct = st.slider("Superspreader %", 0, 50, 10)
-    vacc_pct = st.slider("Vaccination % (blocks transmission)", 0, 80, 20)
+    # Batched in a form: the tree regrows once on submit, not per slider move
+    with st.form("tree_form"):
+        superspreader_pct = st.slider("Superspreader %", 0, 50, 10)
+        vacc_pct = st.slider("Vaccination % (blocks transmission)", 0, 80, 20)
+        # Same seed → same tree, so repeat settings are served from the cache
+        seed = st.number_input("Random seed", 0, 2**31 - 1, 42)
+        st.form_submit_button("Update tree")
     max_gen = 8
 
-    def generate_tree(Re, max_gen, superspreader_pct, vacc_pct, max_nodes=2000):
-
-        G = nx.DiGraph()
-        G.add_node(0, generation=0)
-        node_id = 1
-        current = [0]
-
-        for gen in range(1, max_gen + 1):
-            next_gen = []
-            for parent in current:
-
-                is_super = np.random.rand() < superspreader_pct / 100
-                newR = int(Re * (3 if is_super else 1))
-                newR = max(1, newR)
-
-                for _ in range(newR):
-                    if node_id > max_nodes:
-                        return G
-
-                    vaccinated = np.random.rand() < vacc_pct / 100
-                    G.add_node(node_id, generation=gen, vacc=vaccinated)
-                    G.add_edge(parent, node_id)
-
-                    if not vaccinated:
-                        next_gen.append(node_id)
-
-                    node_id += 1
-
-            current = next_gen
-
-        return G
-
-    G = generate_tree(Re, max_gen, superspreader_pct, vacc_pct)
-
-    # SIMPLE HIERARCHICAL LAYOUT (NO SCIPY REQUIRED)
-    pos = {}
-    gens = {}
-    for n, d in G.nodes(data=True):
-        gens.setdefault(d["generation"], []).append(n)
-
-    for gen, nodes in gens.items():
-        xs = np.linspace(-1, 1, len(nodes))
-        for i, n in enumerate(nodes):
-            pos[n] = (xs[i], -gen)
-
-    edge_x, edge_y = [], []
-    for u, v in G.edges():
-        edge_x.extend([pos[u][0], pos[v][0], None])
-        edge_y.extend([pos[u][1], pos[v][1], None])
-
-    node_x = [pos[n][0] for n in G.nodes()]
-    node_y = [pos[n][1] for n in G.nodes()]
-    node_gen = [G.nodes[n]["generation"] for n in G.nodes()]
-
-    fig = go.Figure()
-
-    fig.add_trace(go.Scatter(
-        x=edge_x, y=edge_y,
-        mode="lines",
-        line=dict(width=1, color="gray"),
-        hoverinfo="none"
-    ))
-
-    fig.add_trace(go.Scatter(
-        x=node_x, y=node_y,
-        mode="markers",
-        marker=dict(
-            size=12,
-            color=node_gen,
-            colorscale="Viridis",
-            showscale=True,
-            colorbar=dict(title="Generation")
-        )
-    ))
-
-    fig.update_layout(
-        showlegend=False,
-        xaxis=dict(visible=False),
-        yaxis=dict(visible=False),
-        height=600
-    )
+    fig = tree_figure(Re, max_gen, superspreader_pct, vacc_pct, int(seed))
 
     st.plotly_chart(fig, use_container_width=True)
 
     # GENERATION TIMING TABLE
+    gens = np.arange(max_gen + 1)
     timing_df = pd.DataFrame({
-        "Generation": list(range(max_gen + 1)),
-        "Approx Days Since Index Case":
-            [round(g * generation_interval, 1) for g in range(max_gen + 1)]
+        "Generation": gens,
+        "Approx Days Since Index Case": np.round(gens * generation_interval, 1)
     })
 
     st.subheader("Generation Timing")
     st.dataframe(timing_df, use_container_width=True)
 
+
 # ============================================================
 # 3. SEIR MODEL
 # ============================================================
-else:
+# Fragment: the duration slider reruns only this block
+@st.fragment
+def render_seir(Re, incubation_days, infectious_days):
 
     st.subheader("SEIR Model")
 
     days = st.slider("Simulation Duration (days)", 30, 200, 100)
 
-    N = 1_000_000
-    I0, E0 = 10, 5
-    S0 = N - I0 - E0
+    df = compute_seir(Re, incubation_days, infectious_days, days)
 
-    beta = Re / infectious_days
-    sigma = 1 / incubation_days
-    gamma = 1 / infectious_days
-
-    S, E, I, R = [S0], [E0], [I0], [0]
+    chart_spec = {
+        "mark": "line",
+        "encoding": {
+            "x": {"field": "index", "type": "quantitative"},
+            "y": {"field": "value", "type": "quantitative"},
+            "color": {"field": "key", "type": "nominal"}
+        },
+        "height": 500
+    }
 
-    for t in range(days):
-        new_E = beta * S[-1] * I[-1] / N
-        new_I = sigma * E[-1]
-        new_R = gamma * I[-1]
+    st.vega_lite_chart(df, chart_spec, use_container_width=True)
 
-        S.append(S[-1] - new_E)
-        E.append(E[-1] + new_E - new_I)
-        I.append(I[-1] + new_I - new_R)
-        R.append(R[-1] + new_R)
 
-    df = pd.DataFrame({"S": S, "E": E, "I": I, "R": R})
-
-    chart = (
-        alt.Chart(df.reset_index())
-        .transform_fold(["S", "E", "I", "R"])
-        .mark_line()
-        .encode(
-            x="index:Q",
-            y="value:Q",
-            color="key:N"
-        )
-        .properties(height=500)
-    )
-
-    st.altair_chart(chart, use_container_width=True)
+# ============================================================
+# SHOW THE SELECTED MODE
+# Shared inputs (disease, Rₑ, timing) stay in the full script; each
+# mode's own widgets rerun only its fragment
+# ============================================================
+if mode == "Animated Spread":
+    render_animated_spread(Re, generation_interval)
+elif mode == "Node Tree Spread":
+    render_node_tree(Re, generation_interval)
+else:
+    render_seir(Re, incubation_days, infectious_days)
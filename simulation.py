@@ -0,0 +1,52 @@
+import numpy as np
+
+# -------------------------------------------------
+# SHARED MODEL CODE
+# Plain NumPy helpers used by more than one page; the
+# pages wrap them in their own cached, page-shaped calls.
+# -------------------------------------------------
+
+# Exponential growth from a single index case: generation g has R**g cases.
+# R may be an array of shape (k, 1) to get k curves from one np.power call.
+def growth_curve(R, generations, dtype=np.float64):
+    gens = np.arange(generations + 1)
+    return gens, np.power(R, gens, dtype=dtype)
+
+
+# SEIR model (forward Euler, 1-day steps). Returns one (4, days + 1) array
+# with rows S, E, I, R, so ravel() gives the long-form blocks without a copy.
+def run_seir(days, beta, sigma, gamma, N, S0, E0, I0):
+    Y = np.empty((4, days + 1))
+    S, E, I, R = Y  # row views
+
+    # Carry the state in plain floats and only write the arrays, so each step
+    # avoids four NumPy scalar reads; beta / N is constant across steps
+    s, e, i, r = float(S0), float(E0), float(I0), 0.0
+    S[0], E[0], I[0], R[0] = s, e, i, r
+    contact = beta / N
+
+    for t in range(1, days + 1):
+        new_E = contact * s * i
+        new_I = sigma * e
+        new_R = gamma * i
+
+        s -= new_E
+        e += new_E - new_I
+        i += new_I - new_R
+        r += new_R
+        S[t], E[t], I[t], R[t] = s, e, i, r
+
+    return Y
+
+
+# Tree edges as (parent, child, NaN) triples — NaN breaks the line like None.
+# float32 arrays go to the browser as binary buffers for WebGL traces.
+def tree_edges(parent, node_x, node_y):
+    child = np.arange(1, len(parent))
+    edge_x = np.full(3 * child.size, np.nan, dtype=np.float32)
+    edge_y = np.full(3 * child.size, np.nan, dtype=np.float32)
+    edge_x[0::3] = node_x[parent[child]]
+    edge_x[1::3] = node_x[child]
+    edge_y[0::3] = node_y[parent[child]]
+    edge_y[1::3] = node_y[child]
+    return edge_x, edge_y